@@ -1,26 +1,61 @@
+import argparse
+import asyncio
+import logging
 import os
+from typing import Optional
+import httpx
 from rich.console import Console
-from groq import Groq
+from rich.logging import RichHandler
+from groq import AsyncGroq
 from .core.feed_handler import load_feeds
 from .core.question_generator import process_articles, save_dataset
 
 console = Console()
 
-def main(test: bool = False):
+async def run(test: bool = False, concurrency: int = 32, double_check: bool = False, batch_api: bool = False, checkpoint: Optional[str] = None):
     # Check for Groq API key
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         console.print("[red]Error: GROQ_API_KEY environment variable not set[/red]")
         return
     
-    client = Groq(api_key=api_key)
     feeds = load_feeds()
     
     if not feeds:
         return
     
-    articles = process_articles(feeds, client, test)
+    # One client, and so one pool of keep-alive connections, for every Groq call in the run;
+    # pass it down rather than constructing a new client per request. The SDK's own retries are
+    # off so llm_cache's retry (which also goes through the rate limiters) is the only layer.
+    client = AsyncGroq(
+        api_key=api_key,
+        max_retries=0,
+        http_client=httpx.AsyncClient(limits=httpx.Limits(max_connections=100, max_keepalive_connections=100))
+    )
+    try:
+        articles = await process_articles(feeds, client, test, concurrency=concurrency, double_check=double_check, batch_api=batch_api, checkpoint_path=checkpoint)
+    finally:
+        await client.close()
     save_dataset(articles)
 
+def main(test: bool = False, concurrency: int = 32, double_check: bool = False, batch_api: bool = False, checkpoint: Optional[str] = None):
+    # RichHandler writes through Rich's console, so log lines don't garble the progress bars.
+    # Set REALTIME_EVAL_DEBUG=1 to see per-feed and evaluator debug output; only this package's
+    # loggers are raised, so httpx, aiohttp, groq and asyncio stay quiet.
+    logging.basicConfig(level=logging.WARNING, format="%(message)s", handlers=[RichHandler()])
+    if os.getenv("REALTIME_EVAL_DEBUG"):
+        logging.getLogger("realtime_eval").setLevel(logging.DEBUG)
+    asyncio.run(run(test, concurrency, double_check, batch_api, checkpoint))
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a real-time news question/answer dataset.")
+    parser.add_argument("--test", action="store_true", help="Only process the first 5 recent articles of each feed")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum number of feed, article and Groq requests in flight at once")
+    parser.add_argument("--double-check", action="store_true", help="Re-check generated pairs with the separate evaluator model")
+    parser.add_argument("--batch-api", action="store_true", help="Generate through Groq's Batch API: about half the cost and no rate limits, but results can take hours")
+    parser.add_argument("--checkpoint", metavar="PATH", help="Append each generated pair to this JSONL file and skip articles already in it, so an interrupted run can be resumed")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main(test=False)
\ No newline at end of file
+    args = parse_args()
+    main(test=args.test, concurrency=args.concurrency, double_check=args.double_check, batch_api=args.batch_api, checkpoint=args.checkpoint)
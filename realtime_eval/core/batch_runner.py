@@ -0,0 +1,77 @@
+import asyncio
+import orjson
+from typing import Dict
+from rich.console import Console
+from groq import AsyncGroq
+from .llm_cache import retry_transient
+
+console = Console()
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+def build_batch_file(bodies: Dict[str, Dict]) -> bytes:
+    """Serialize chat completion request bodies, keyed by custom_id, into Batch API JSONL."""
+    return b"".join(
+        orjson.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": CHAT_COMPLETIONS_ENDPOINT,
+            "body": body
+        }) + b"\n"
+        for custom_id, body in bodies.items()
+    )
+
+def parse_batch_output(output: bytes) -> Dict[str, str]:
+    """Return the message content of each successful request in a Batch API output file, keyed by custom_id."""
+    contents = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        row = orjson.loads(line)
+        response = row.get("response") or {}
+        if response.get("status_code") != 200:
+            console.print(f"[red]Batch request {row.get('custom_id')} failed: {row.get('error') or response.get('status_code')}[/red]")
+            continue
+        choices = response.get("body", {}).get("choices") or []
+        if choices and choices[0]["message"].get("content"):
+            contents[row["custom_id"]] = choices[0]["message"]["content"]
+    return contents
+
+async def run_chat_batch(client: AsyncGroq, bodies: Dict[str, Dict], completion_window: str = "24h", poll_interval: float = 10, max_poll_interval: float = 300) -> Dict[str, str]:
+    """Run chat completion requests as a single Groq batch job and wait for the results.
+
+    Args:
+        client: Groq client instance
+        bodies: Chat completion request bodies keyed by custom_id
+        completion_window: How long Groq may take to process the batch
+        poll_interval: Initial delay in seconds between status checks
+        max_poll_interval: Upper bound for the exponentially growing delay between status checks
+
+    Returns:
+        The message content of each successful request, keyed by custom_id
+    """
+    if not bodies:
+        return {}
+
+    input_file = await retry_transient(client.files.create)(file=("batch_input.jsonl", build_batch_file(bodies)), purpose="batch")
+    batch = await retry_transient(client.batches.create)(
+        input_file_id=input_file.id,
+        endpoint=CHAT_COMPLETIONS_ENDPOINT,
+        completion_window=completion_window
+    )
+    console.print(f"[blue]Submitted batch {batch.id} with {len(bodies)} requests[/blue]")
+
+    while batch.status not in TERMINAL_STATUSES:
+        await asyncio.sleep(poll_interval)
+        poll_interval = min(poll_interval * 2, max_poll_interval)
+        batch = await retry_transient(client.batches.retrieve)(batch.id)
+
+    if batch.status != "completed":
+        console.print(f"[yellow]Batch {batch.id} finished with status '{batch.status}'[/yellow]")
+    # Expired batches still report the requests that did complete
+    if not batch.output_file_id:
+        return {}
+
+    output = await retry_transient(client.files.content)(batch.output_file_id)
+    return parse_batch_output(await output.read())
@@ -1,48 +1,86 @@
 from newspaper import Article
-from typing import Optional
+from typing import List, Optional, Tuple
 from rich.console import Console
-import concurrent.futures
-import threading
+import asyncio
+import hashlib
+import re
+import aiohttp
 
 console = Console()
 
-def _download_article(article: Article) -> None:
-    """Helper function to download article content in a separate thread."""
-    article.download()
+# Simhashes this many bits apart or fewer are treated as the same article
+NEAR_DUPLICATE_DISTANCE = 3
 
-def extract_article_content(url: str, min_content_length: int = 500, timeout: int = 20) -> Optional[str]:
+async def fetch_html(session: aiohttp.ClientSession, url: str, timeout: int = 20) -> Optional[bytes]:
     """
-    Extract the main content from a web article.
+    Download the raw HTML of a web article using a shared aiohttp session.
     
     Args:
+        session: The aiohttp session to download with
         url: The URL of the article
+        timeout: Timeout in seconds for the whole download
+        
+    Returns:
+        The response body if the download succeeded, None otherwise
+    """
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            response.raise_for_status()
+            return await response.read()
+    except asyncio.TimeoutError:
+        console.print(f"[red]Timeout while downloading article from {url}[/red]")
+        return None
+    except aiohttp.ClientError as e:
+        console.print(f"[red]Error downloading article from {url}: {e}[/red]")
+        return None
+
+def parse_article_html(url: str, html: bytes, min_content_length: int = 500) -> Tuple[Optional[str], Optional[str], Optional[int], Optional[str]]:
+    """
+    Extract the main content from the downloaded HTML of a web article without printing anything,
+    so it can run in a worker process. The duplicate-detection fingerprints are computed here too,
+    since hashing a long article is CPU-bound work that would otherwise block the event loop.
+    
+    Args:
+        url: The URL the HTML was downloaded from
+        html: The raw HTML of the article
         min_content_length: Minimum number of characters required for valid content
-        timeout: Timeout in seconds for downloading and parsing the article
         
     Returns:
-        The extracted article content if successful and meets length requirements, None otherwise
+        (content, content_hash, simhash, None) if extraction succeeded and meets length
+        requirements, otherwise (None, None, None, a message explaining why not)
     """
     try:
         article = Article(url)
-        
-        # Download article with timeout
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_download_article, article)
-            try:
-                future.result(timeout=timeout)
-            except concurrent.futures.TimeoutError:
-                console.print(f"[red]Timeout while downloading article from {url}[/red]")
-                return None
-                
+        article.download(input_html=html)
         article.parse()
         
         content = article.text.strip()
         
         if len(content) < min_content_length:
-            console.print(f"[yellow]Article content too short ({len(content)} chars) for URL: {url}[/yellow]")
-            return None
+            return None, None, None, f"[yellow]Article content too short ({len(content)} chars) for URL: {url}[/yellow]"
             
-        return content
+        return content, content_hash(content), simhash(content), None
     except Exception as e:
-        console.print(f"[red]Error extracting content from {url}: {e}[/red]")
-        return None 
\ No newline at end of file
+        return None, None, None, f"[red]Error extracting content from {url}: {e}[/red]"
+
+def _normalize_text(text: str) -> str:
+    return re.sub(r'\s+', ' ', text.lower()).strip()
+
+def content_hash(text: str) -> str:
+    """Hash the normalized opening of an article so exact re-publications can be detected."""
+    return hashlib.sha256(_normalize_text(text)[:4096].encode()).hexdigest()
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """Compute a 64-bit simhash over word shingles; near-identical texts differ in only a few bits."""
+    tokens = re.findall(r'\w+', text.lower())
+    weights = [0] * 64
+    for i in range(max(len(tokens) - shingle_size + 1, 1)):
+        shingle = " ".join(tokens[i:i + shingle_size])
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+def is_near_duplicate(fingerprint: int, seen: List[int], max_distance: int = NEAR_DUPLICATE_DISTANCE) -> bool:
+    """Check whether a simhash is within max_distance bits of any previously seen simhash."""
+    return any((fingerprint ^ other).bit_count() <= max_distance for other in seen)
@@ -1,8 +1,18 @@
-import json
+import asyncio
+import os
+import re
+import orjson
+import aiohttp
 import feedparser
 import requests
-from datetime import datetime, timedelta
-from typing import List, Dict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, List, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -14,59 +24,157 @@ date_formats = [
     "%a, %d %b %Y %H:%M:%S GMT"
 ]
 
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+HTTP_HEADERS = {
+    "User-Agent": "realtime-eval/1.0",
+    "Accept-Encoding": "gzip"
+}
+
+def _create_session() -> requests.Session:
+    """Create an HTTP session with connection pooling and retries on server errors."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
+# Shared across feed and article downloads so keep-alive connections are reused
+http_session = _create_session()
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    # Created on first use rather than at import, so worker processes started with the
+    # spawn method can import this module without each creating a pool of their own
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _parse_pool
+
+def _replace_parse_pool(broken: ProcessPoolExecutor) -> None:
+    global _parse_pool
+    # Concurrent callers may all see the same broken pool; only the first discards it
+    if _parse_pool is broken:
+        _parse_pool = None
+        broken.shutdown(wait=False)
+
+async def run_in_parse_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """Run CPU-bound parsing in the shared process pool so it neither blocks the event loop nor holds the GIL.
+    
+    func must be a module-level function, and its arguments and result must be picklable.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_parse_pool()
+    try:
+        return await loop.run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed), which breaks the whole pool; replace it once and retry
+        _replace_parse_pool(pool)
+        return await loop.run_in_executor(_get_parse_pool(), func, *args)
+
 def load_feeds() -> List[Dict]:
     """Load RSS feed URLs from the JSON file."""
     try:
-        with open('feeds.json', 'r') as f:
-            return json.load(f)['feeds']
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+        with open('feeds.json', 'rb') as f:
+            return orjson.loads(f.read())['feeds']
+    except (FileNotFoundError, orjson.JSONDecodeError) as e:
         console.print(f"[red]Error loading feeds: {str(e)}[/red]")
         return []
 
 def fetch_feed(feed_url: str) -> feedparser.FeedParserDict:
     """Fetch and parse an RSS feed."""
     try:
-        response = requests.get(feed_url, timeout=10)
+        response = http_session.get(feed_url, timeout=10)
         response.raise_for_status()
         return feedparser.parse(response.content)
     except (requests.RequestException, requests.Timeout) as e:
         console.print(f"[red]Error fetching feed {feed_url}: {e}[/red]")
         return feedparser.FeedParserDict()
 
-def format_date(date_str: str) -> str:
-    """Format the date string to a more readable format."""    
-    for date_format in date_formats:
-        try:
-            date = datetime.strptime(date_str, date_format)
-            return date.strftime("%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            continue
-    raise ValueError(f"No valid date format found for {date_str}")
+def _parse_feed(body: bytes) -> feedparser.FeedParserDict:
+    feed = feedparser.parse(body)
+    # The parser exception attached to malformed feeds does not always pickle
+    feed.pop('bozo_exception', None)
+    return feed
 
-def is_within_24_hours(date_str: str) -> bool:
-    """Check if the date is within the last 24 hours."""
+async def fetch_feed_async(session: aiohttp.ClientSession, feed_url: str) -> feedparser.FeedParserDict:
+    """Fetch and parse an RSS feed using a shared aiohttp session."""
+    try:
+        async with session.get(feed_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            response.raise_for_status()
+            body = await response.read()
+        # Parse in a worker process so large feeds don't stall other downloads on the event loop
+        return await run_in_parse_pool(_parse_feed, body)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        console.print(f"[red]Error fetching feed {feed_url}: {e}[/red]")
+        return feedparser.FeedParserDict()
 
-    for date_format in date_formats:
+def parse_date(date_str: str) -> datetime:
+    """Parse an RSS date string into a timezone-aware datetime (naive dates are assumed UTC)."""
+    try:
+        # RSS dates are RFC 2822, which the email parser handles in one pass
+        date = parsedate_to_datetime(date_str)
+    except (TypeError, ValueError):
+        for date_format in date_formats:
+            try:
+                date = datetime.strptime(date_str, date_format)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"No valid date format found for {date_str}")
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date
+
+def parse_dates(date_strs: List[str]) -> List[Optional[datetime]]:
+    """Parse a list of RSS date strings, using None for dates that cannot be parsed."""
+    dates = []
+    for date_str in date_strs:
         try:
-            date = datetime.strptime(date_str, date_format)
-            now = datetime.now(date.tzinfo) if date.tzinfo else datetime.utcnow()
-            return date > now - timedelta(days=1)
+            dates.append(parse_date(date_str))
         except ValueError:
-            continue
-    return False
+            dates.append(None)
+    return dates
+
+def format_date(date_str: str) -> str:
+    """Format the date string to a more readable format."""
+    return parse_date(date_str).strftime(DATE_FORMAT)
 
-def is_within_7_days(date_str: str) -> bool:
-    """Check if the date is within the last 7 days."""
+def _clean_title(title: str) -> str:
+    title = re.sub(r'[^\w\s]', ' ', title.lower())
+    return re.sub(r'\s+', ' ', title).strip()
 
-    for date_format in date_formats:
-        try:
-            date = datetime.strptime(date_str, date_format)
-            now = datetime.now(date.tzinfo) if date.tzinfo else datetime.utcnow()
-            return date > now - timedelta(days=7)
-        except ValueError:
-            continue
-    return False
+def normalize_title(title: str, publishers: Iterable[str] = ()) -> str:
+    """Normalize a headline for duplicate detection (lowercase, no punctuation, collapsed whitespace).
     
+    A trailing " - Publisher", " | Publisher" or " — Publisher" is dropped only when it names one
+    of the given publishers, since the same separators also join two halves of a headline
+    ("Stocks fall — Dow drops 500 points").
+    """
+    match = re.search(r'\s+[-|\u2013\u2014]\s+([^-|\u2013\u2014]+)$', title)
+    if match and _clean_title(match.group(1)) in {_clean_title(publisher) for publisher in publishers}:
+        title = title[:match.start()]
+    return _clean_title(title)
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "cmpid"}
+
+def canonicalize_url(url: str) -> str:
+    """Canonicalize an article URL for duplicate detection (lowercase host, no tracking parameters or fragment)."""
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
 def display_articles(feed: feedparser.FeedParserDict, feed_name: str):
     """Display articles from a feed in a rich table."""
     if not feed.entries:
@@ -0,0 +1,19 @@
+import os
+from typing import Dict
+from aiolimiter import AsyncLimiter
+
+# Account-wide Groq quotas shared by every generator and evaluator call in the process.
+# Override to match your plan, e.g. REALTIME_EVAL_RPM=30 REALTIME_EVAL_TPM=6000 on the free tier.
+REQUESTS_PER_MINUTE = int(os.getenv("REALTIME_EVAL_RPM", "500"))
+TOKENS_PER_MINUTE = int(os.getenv("REALTIME_EVAL_TPM", "200000"))
+
+rpm_limiter = AsyncLimiter(REQUESTS_PER_MINUTE, 60)
+tpm_limiter = AsyncLimiter(TOKENS_PER_MINUTE, 60)
+
+def estimate_tokens(request: Dict) -> int:
+    """Roughly estimate the tokens a chat completion request counts against the quota.
+    
+    Prompt tokens are approximated as 4 characters each; Groq also reserves max_tokens up front.
+    """
+    prompt_chars = sum(len(message["content"]) for message in request["messages"])
+    return prompt_chars // 4 + request.get("max_tokens", 0)
@@ -0,0 +1,128 @@
+import hashlib
+import orjson
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from rich.console import Console
+from groq import APIConnectionError, APITimeoutError, AsyncGroq, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from .feed_handler import normalize_title
+from .limits import estimate_tokens, rpm_limiter, tpm_limiter
+
+console = Console()
+
+CACHE_DIR = Path(os.getenv("REALTIME_EVAL_CACHE_DIR", Path.home() / ".cache" / "realtime_eval"))
+CACHE_TTL = 7 * 24 * 60 * 60
+# Minimum Jaccard similarity between headline token sets to count as the same story.
+# Kept strict because a single changed entity ("Fed" vs "ECB") changes the facts.
+SIMILARITY_THRESHOLD = 0.8
+
+_similar_titles: List[Tuple[frozenset, Any]] = []
+_similar_lock = threading.Lock()
+
+def make_key(*parts: Any) -> str:
+    """Build a stable SHA-256 cache key from JSON-serializable parts."""
+    payload = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+def _cache_path(key: str) -> Path:
+    return CACHE_DIR / f"{key}.json"
+
+def get(key: str) -> Optional[Any]:
+    """Return the cached value for a key, or None if it is missing or expired."""
+    path = _cache_path(key)
+    try:
+        if time.time() - path.stat().st_mtime > CACHE_TTL:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+def put(key: str, value: Any) -> None:
+    """Store a JSON-serializable value under a key."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(value))
+        os.replace(tmp_path, _cache_path(key))
+    except OSError as e:
+        console.print(f"[yellow]Could not write cache entry {key}: {e}[/yellow]")
+
+def request_key(request: Dict) -> str:
+    """Build the cache key for a chat completion request (model, messages and sampling parameters)."""
+    return make_key(request)
+
+# Rate limits and dropped connections are transient; back off with jitter so concurrent
+# callers do not retry in lockstep. Other API errors are raised straight away. This is the
+# only retry layer: the client is created with the SDK's own retries turned off.
+retry_transient = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+    reraise=True
+)
+
+@retry_transient
+async def _call_llm(client: AsyncGroq, request: Dict) -> Optional[str]:
+    # Wait for room under both the request and token quotas; a request larger than the whole
+    # token budget just waits for a full window
+    await rpm_limiter.acquire()
+    await tpm_limiter.acquire(min(estimate_tokens(request), tpm_limiter.max_rate))
+    response = await client.chat.completions.create(**request)
+    return response.choices[0].message.content
+
+async def chat_json(client: AsyncGroq, request: Dict) -> Any:
+    """Send a chat completion request, retrying transient failures, and return the JSON-parsed reply."""
+    content = await _call_llm(client, request)
+    if not content:
+        raise ValueError(f"Empty response from {request['model']}")
+    return orjson.loads(content)
+
+async def cached_chat(client: AsyncGroq, request: Dict, validate: Optional[Callable[[Any], Any]] = None) -> Any:
+    """Send a chat completion request, serving identical requests from the on-disk cache.
+    
+    validate, if given, returns a well-formed reply and raises ValueError for a malformed one.
+    Only replies that parse as JSON and pass it are cached, so a bad reply is requested again
+    next time instead of being replayed; cached entries that fail it are requested again too.
+    """
+    key = request_key(request)
+    result = get(key)
+    if result is not None and validate:
+        try:
+            result = validate(result)
+        except ValueError:
+            result = None
+    if result is None:
+        result = await chat_json(client, request)
+        if validate:
+            result = validate(result)
+        put(key, result)
+    return result
+
+def _title_tokens(title: str) -> frozenset:
+    return frozenset(normalize_title(title).split())
+
+def find_similar(title: str, threshold: float = SIMILARITY_THRESHOLD) -> Optional[Any]:
+    """Return the value remembered for the most similar headline seen in this run, if any meets the threshold."""
+    tokens = _title_tokens(title)
+    if not tokens:
+        return None
+    best_score, best_value = 0.0, None
+    with _similar_lock:
+        for other_tokens, value in _similar_titles:
+            score = len(tokens & other_tokens) / len(tokens | other_tokens)
+            if score > best_score:
+                best_score, best_value = score, value
+    return best_value if best_score >= threshold else None
+
+def remember(title: str, value: Any) -> None:
+    """Remember a value for a headline so near-duplicate headlines can reuse it."""
+    tokens = _title_tokens(title)
+    if tokens:
+        with _similar_lock:
+            _similar_titles.append((tokens, value))
@@ -1,15 +1,194 @@
-import json
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+import asyncio
+import logging
+import os
+import random
+import re
+import orjson
+from collections import defaultdict
+from itertools import compress
+from typing import Any, Awaitable, BinaryIO, Iterable, Iterator, List, Dict, Optional, Tuple, TypeVar
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
 from rich.console import Console
 from rich.progress import Progress
-from groq import Groq
-from .feed_handler import fetch_feed, format_date, load_feeds, is_within_7_days
-from .content_extractor import extract_article_content
+import aiohttp
+from groq import APIError, AsyncGroq
+from .feed_handler import DATE_FORMAT, HTTP_HEADERS, canonicalize_url, fetch_feed_async, normalize_title, parse_dates, run_in_parse_pool
+from .content_extractor import fetch_html, is_near_duplicate, parse_article_html
+from . import batch_runner, llm_cache
 
 console = Console()
+logger = logging.getLogger(__name__)
 
-@dataclass
+T = TypeVar("T")
+
+# Models can be overridden, e.g. REALTIME_EVAL_QA_MODEL=llama-3.1-8b-instant for cheaper generation runs;
+# models without structured output support fall back to plain JSON mode (see JSON_SCHEMA_MODELS)
+QA_MODEL = os.getenv("REALTIME_EVAL_QA_MODEL", "meta-llama/llama-4-maverick-17b-128e-instruct")
+# Up to 3 pairs with answer_context and keep_reason fit comfortably; Groq counts max_tokens against the token rate limit
+QA_MAX_TOKENS = 1200
+# Article text sent to the generator is capped at roughly this many tokens (about 4 characters each)
+MAX_CONTENT_TOKENS = 3000
+
+QA_SYSTEM_PROMPT = (
+    "You are a helpful assistant that generates questions and answers in JSON format to test an LLM's ability to access real-time information from news articles. "
+    "Use the following guidelines:\n\n"
+    "1. Analyze the article content and generate up to 3 specific questions that can be answered using direct quotes or specific information from the article. "
+    "* Each question should be about something that has happened or been learned only in the past 7 days. It should be newsworthy and significant."
+    "* Each question should ask a question that can be researched rather than referencing the specific article, as the answerer will be searching for the answer online instead of having the specific article to reference."
+    "* Each question should be clear, specific, and test the ability to find information within the text.\n\n"
+    "2. Each answer should be a direct quote or specific information from the article that answers the question. Create questions where the answer is clear and specific, rather than vague answers like \"good enough\" or \"get moving\"."
+    "Include the exact text from the article that contains the answer.\n\n"
+    "3. Your response must be in a JSON schema with an array of objects, each containing: 'question', 'answer', 'answer_context', 'keep', and 'keep_reason'. "
+    "'answer_context' should contain the exact text from the article that contains the answer.\n\n"
+    "4. Evaluate each pair you generate and set 'keep' to true only if it is strong: clear, specific, and based on a real-time event. "
+    "The question should include a date or time-related detail from the article, or be specific enough to remain relevant beyond a few weeks, and MUST be about something that has happened or been learned only in the past 7 days. "
+    "Prefer difficult questions that are very specific and detailed over a simple fact or event; set 'keep' to false for general knowledge or older events. "
+    "Explain the decision briefly in 'keep_reason'.\n\n"
+    "5. If the article doesn't contain enough specific information to generate good question-answer pairs, output 'SKIP' for all values.\n\n"
+    "Example response:\n"
+    "{\n"
+    "  \"qa_pairs\": [\n"
+    "    {\n"
+    "      \"question\": \"What specific action did the Federal Reserve announce regarding interest rates?\",\n"
+    "      \"answer\": \"The Federal Reserve announced it would maintain the current interest rates.\",\n"
+    "      \"answer_context\": \"In a statement released today, the Federal Reserve announced it would maintain the current interest rates, citing stable economic indicators.\",\n"
+    "      \"keep\": false,\n"
+    "      \"keep_reason\": \"The question has no date or time-related detail, so it will not stay answerable beyond a few weeks.\"\n"
+    "    },\n"
+    "    {\n"
+    "      \"question\": \"What was the reported inflation rate for October 2024 that influenced the Fed's decision to maintain interest rates?\",\n"
+    "      \"answer\": \"The inflation rate was 3.2% in October 2024\",\n"
+    "      \"answer_context\": \"The Federal Reserve's decision was influenced by the latest economic data showing inflation at 3.2% in October 2024, down from 3.7% in September 2024.\",\n"
+    "      \"keep\": true,\n"
+    "      \"keep_reason\": \"Specific, recent, and dated figure that requires finding this week's news.\"\n"
+    "    },\n"
+    "    {\n"
+    "      \"question\": \"What did Jerome Powell say about the health of the economy in his speech at the National Press Club?\",\n"
+    "      \"answer\": \"Jerome Powell said the economy is strong and growing.\",\n"
+    "      \"answer_context\": \"Jerome Powell spoke at the National Press Club about the state of the economy. He said the economy is strong and growing, but the Fed is keeping interest rates low to support the economy.\",\n"
+    "      \"keep\": true,\n"
+    "      \"keep_reason\": \"Tied to a specific recent speech and answerable from news coverage.\"\n"
+    "    }\n"
+    "  ]\n"
+    "}"
+)
+
+EVAL_MODEL = os.getenv("REALTIME_EVAL_EVAL_MODEL", "meta-llama/llama-4-maverick-17b-128e-instruct")
+
+EVAL_SYSTEM_PROMPT = (
+    "You are a helpful assistant that evaluates questions and answers in JSON format to filter question answer pairsthat will be used to test an LLM's ability to access real-time information from news headlines. "
+    "Use the following guidelines:\n\n"
+    "1. Analyze each question and answer pair to determine if it meets the criteria of being clear, specific, and based on a real-time event. The question should include a date or time-related detail from the article, or be specific enough to remain relevant beyond a few weeks. The question MUST be about something that has happened or been learned only in the past 7 days. Choose the most difficult questions to answer, that are very specific and detailed, rather than a simple fact or event."
+    "If the pair is strong, include its index in the response. Include any pairs that are strong based on this criteria.\n\n"
+    "2. Return a JSON object with reasoning and indices fields."
+    "Example response: {\"reasoning\": \"Pair 0 is good because...\", \"indices\": [0, 1, 2]}"
+    "Example strong pairs:\n"
+    "[{\"question\": \"What was the outcome of SpaceX's launch yesterday?\", \"answer\": \"SpaceX successfully launched 22 Starlink satellites yesterday from Florida.\"},\n"
+    " {\"question\": \"Who won the recent World Series?\", \"answer\": \"The Texas Rangers won the recent World Series.\"},\n"
+    " {\"question\": \"What did the Fed announce about interest rates this week?\", \"answer\": \"The Federal Reserve announced it is maintaining current interest rates this week.\"}]"
+    "Example weak pairs:\n"
+    "[{\"question\": \"What is the capital of France?\", \"answer\": \"Paris is the capital of France.\"},\n"
+    " {\"question\": \"Who won the presidential election five years ago in 2020?\", \"answer\": \"Joe Biden won the presidential election in 2020.\"}]"
+)
+
+QA_PAIR_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "question": {"type": "string"},
+        "answer": {"type": "string"},
+        "answer_context": {"type": "string"},
+        "keep": {"type": "boolean"},
+        "keep_reason": {"type": "string"}
+    },
+    "required": ["question", "answer", "answer_context", "keep", "keep_reason"]
+}
+
+QA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "qa_pairs": {"type": "array", "items": QA_PAIR_SCHEMA}
+    },
+    "required": ["qa_pairs"]
+}
+
+QA_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "articles": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    "qa_pairs": {"type": "array", "items": QA_PAIR_SCHEMA}
+                },
+                "required": ["index", "qa_pairs"]
+            }
+        }
+    },
+    "required": ["articles"]
+}
+
+EVAL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "reasoning": {"type": "string"},
+        "indices": {"type": "array", "items": {"type": "integer"}}
+    },
+    "required": ["reasoning", "indices"]
+}
+
+# Groq models that accept response_format={"type": "json_schema"}; any other model gets a 400 for it
+JSON_SCHEMA_MODELS = {
+    "meta-llama/llama-4-maverick-17b-128e-instruct",
+    "meta-llama/llama-4-scout-17b-16e-instruct",
+    "moonshotai/kimi-k2-instruct",
+    "openai/gpt-oss-20b",
+    "openai/gpt-oss-120b"
+}
+
+def _response_format(model: str, name: str, schema: Dict) -> Dict:
+    """Constrain replies to a JSON schema where the model supports it, and to any JSON object otherwise."""
+    if model in JSON_SCHEMA_MODELS:
+        return {"type": "json_schema", "json_schema": {"name": name, "schema": schema}}
+    # JSON mode needs "JSON" in the prompt, which both system prompts include
+    return {"type": "json_object"}
+
+# Built once so every request carries an identical response_format
+QA_RESPONSE_FORMAT = _response_format(QA_MODEL, "qa_pairs", QA_SCHEMA)
+QA_BATCH_RESPONSE_FORMAT = _response_format(QA_MODEL, "qa_batch", QA_BATCH_SCHEMA)
+EVAL_RESPONSE_FORMAT = _response_format(EVAL_MODEL, "evaluation", EVAL_SCHEMA)
+
+# Sent in the user message so the system prompt stays identical between single and batched requests
+QA_BATCH_INSTRUCTIONS = (
+    "Each article below is numbered. Apply the guidelines to every article independently and respond with a JSON object of the form "
+    "{\"articles\": [{\"index\": 0, \"qa_pairs\": [...]}, ...]} containing one entry per article, in order. "
+    "Use 'SKIP' for all values of an article that doesn't contain enough specific information."
+)
+
+# Articles shorter than this, or without any time reference, rarely yield dated real-time questions
+MIN_ATTEMPT_LENGTH = 800
+TIME_REFERENCE_PATTERN = re.compile(
+    r"\b(20\d{2}|yesterday|today|tonight|this (?:week|month|year)|last (?:week|month)|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"jan(?:uary)?|feb(?:ruary)?|march|april|june|july|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b",
+    re.IGNORECASE
+)
+
+# User message templates; only the article text and pairs vary between requests
+QA_USER_TEMPLATE = "Article title: {title}\n\nArticle content:\n{content}\n\nGenerate up to 3 questions and answers based on this article:"
+QA_BATCH_ARTICLE_TEMPLATE = "Article {index}:\nArticle title: {title}\n\nArticle content:\n{content}"
+QA_BATCH_USER_TEMPLATE = "{instructions}\n\n{articles}\n\nGenerate up to 3 questions and answers for each article:"
+EVAL_USER_TEMPLATE = "Evaluate these question-answer pairs and return the 'id' of each strong pair in 'indices': {pairs}"
+
+# Shared, never mutated, so the prompt prefix is the same object and bytes in every request
+QA_SYSTEM_MESSAGE = {"role": "system", "content": QA_SYSTEM_PROMPT}
+EVAL_SYSTEM_MESSAGE = {"role": "system", "content": EVAL_SYSTEM_PROMPT}
+
+@dataclass(slots=True)
 class Article:
     title: str
     link: str
@@ -18,230 +197,587 @@ class Article:
     question: Optional[str] = None
     answer: Optional[str] = None
     answer_context: Optional[str] = None
+    published_dt: Optional[datetime] = None
+
+def iter_checkpoint(filename: str) -> Iterator[Article]:
+    """Yield the articles written to a JSONL checkpoint by an earlier, possibly interrupted, run."""
+    try:
+        with open(filename, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                # A crash mid-write can leave the last line truncated, and a checkpoint written
+                # by another version may have different fields; either way the row is skipped
+                try:
+                    row = orjson.loads(line)
+                    if row.get('published_dt'):
+                        row['published_dt'] = datetime.fromisoformat(row['published_dt'])
+                    article = Article(**row)
+                except (AttributeError, TypeError, ValueError):
+                    console.print(f"[yellow]Ignoring malformed line in checkpoint {filename}[/yellow]")
+                    continue
+                yield article
+    except FileNotFoundError:
+        return
+
+def open_checkpoint(filename: str) -> BinaryIO:
+    """Open a JSONL checkpoint for appending, first ending a last line left partial by a crash."""
+    try:
+        with open(filename, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            partial = f.read(1) != b"\n"
+    except OSError:
+        # Missing or empty file
+        partial = False
+    f = open(filename, 'ab')
+    if partial:
+        f.write(b"\n")
+    return f
+
+def load_checkpoint(filename: str) -> List[Article]:
+    """Load every article from a JSONL checkpoint; a missing file yields an empty list."""
+    return list(iter_checkpoint(filename))
+
+def truncate_content(content: str, max_tokens: int = MAX_CONTENT_TOKENS) -> str:
+    """Shorten article text to about max_tokens tokens, keeping the opening and the end of the article."""
+    max_chars = max_tokens * 4
+    if len(content) <= max_chars:
+        return content
+    # The lede carries most of the facts; the tail often has the latest updates
+    head = max_chars * 3 // 4
+    tail = max_chars - head
+    return content[:head] + "\n...\n" + content[-tail:]
+
+def _should_attempt(content: str) -> bool:
+    """Cheaply decide whether an article is worth a generator call (long enough and mentions a time)."""
+    return len(content) >= MIN_ATTEMPT_LENGTH and TIME_REFERENCE_PATTERN.search(content) is not None
+
+def _prompt_articles(batch: List[Tuple[str, str, datetime, str]]) -> List[Tuple[str, str]]:
+    """Return the (title, content) pairs sent to the generator, truncating long articles."""
+    prompt_articles = []
+    for title, _, _, content in batch:
+        truncated = truncate_content(content)
+        if len(truncated) < len(content):
+            logger.debug("Truncated '%s' to %.0f%% of its length", title, 100 * len(truncated) / len(content))
+        prompt_articles.append((title, truncated))
+    return prompt_articles
+
+def _qa_messages(title: str, content: str) -> List[Dict[str, str]]:
+    """Build the chat messages used to generate Q&A pairs for a single article."""
+    return [
+        QA_SYSTEM_MESSAGE,
+        {"role": "user", "content": QA_USER_TEMPLATE.format(title=title, content=content)}
+    ]
 
-def generate_questions_and_answers(title: str, content: str, client: Groq) -> Optional[List[Dict[str, str]]]:
+def _qa_request(title: str, content: str) -> Dict:
+    """Build the chat completion request used to generate Q&A pairs for a single article."""
+    return {
+        "model": QA_MODEL,
+        "messages": _qa_messages(title, content),
+        "temperature": 0.2,
+        "max_tokens": QA_MAX_TOKENS,
+        "response_format": QA_RESPONSE_FORMAT
+        # No "n": Groq rejects anything but n=1. Asking for up to 3 candidate pairs that the
+        # model grades with 'keep' gives the same pick-the-best effect in a single sample.
+    }
+
+def _near_duplicate_result(title: str, content: str) -> Optional[Dict]:
+    """Return an empty (skipped) result if this article repeats a near-duplicate headline from this run.
+    
+    The article counts as a repeat when its headline is similar and the earlier article's
+    answers are grounded in its text; its pairs are not emitted again under a second link.
+    """
+    similar = llm_cache.find_similar(title)
+    if not similar:
+        return None
+    if not any(
+        isinstance(qa_pair, dict) and qa_pair.get("answer_context") and qa_pair["answer_context"] in content
+        for qa_pair in similar.get("qa_pairs", [])
+    ):
+        return None
+    return {"qa_pairs": []}
+
+def _lookup_cached_result(cache_key: str, title: str, content: str) -> Optional[Dict]:
+    """Return a previously generated result for this article from the disk cache, or a skipped result for a near-duplicate headline."""
+    result = llm_cache.get(cache_key)
+    # Entries written before replies were validated may be malformed; generate those again
+    if result is not None:
+        try:
+            result = _check_qa_result(result)
+        except ValueError:
+            result = None
+    if result is None:
+        result = _near_duplicate_result(title, content)
+    return result
+
+def _store_result(cache_key: str, title: str, result: Dict) -> None:
+    llm_cache.put(cache_key, result)
+    llm_cache.remember(title, result)
+
+def _is_valid_qa_pair(qa_pair: Any) -> bool:
+    """Check that a generated pair has string question, answer and answer_context and a boolean keep."""
+    return (
+        isinstance(qa_pair, dict)
+        and all(isinstance(qa_pair.get(field), str) for field in ("question", "answer", "answer_context"))
+        and isinstance(qa_pair.get("keep"), bool)
+    )
+
+def _is_valid_qa_pairs(qa_pairs: Any) -> bool:
+    """Check that an article's pairs are either the model's SKIP marker or all well formed."""
+    if not isinstance(qa_pairs, list):
+        return False
+    if qa_pairs and isinstance(qa_pairs[0], dict) and qa_pairs[0].get("question") == "SKIP":
+        return True
+    return all(_is_valid_qa_pair(qa_pair) for qa_pair in qa_pairs)
+
+def _check_qa_result(result: Any) -> Dict:
+    """Return a parsed generator reply if it is well formed, raising ValueError otherwise.
+    
+    Run before a reply is cached, so a malformed one is neither stored nor reused.
+    """
+    if not isinstance(result, dict) or not _is_valid_qa_pairs(result.get("qa_pairs", [])):
+        raise ValueError(f"Malformed Q&A response: {result!r:.200}")
+    return result
+
+def _extract_qa_pairs(result: Dict) -> Optional[List[Dict[str, str]]]:
+    """Return the Q&A pairs from a parsed response, or None if the model skipped the article."""
+    qa_pairs = result.get("qa_pairs", [])
+    if not qa_pairs or qa_pairs[0].get("question") == "SKIP":
+        return None
+    return qa_pairs
+
+async def generate_questions_and_answers(title: str, content: str, client: AsyncGroq) -> Optional[List[Dict[str, str]]]:
     """Generate up to 3 questions and answers based on the article content using Groq API."""
+    request = _qa_request(title, content)
+    # Identical requests (e.g. reruns over the same feeds) are served from the on-disk cache
+    cache_key = llm_cache.request_key(request)
     try:
-        response = client.chat.completions.create(
-            model="meta-llama/llama-4-maverick-17b-128e-instruct",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful assistant that generates questions and answers in JSON format to test an LLM's ability to access real-time information from news articles. "
-                        "Use the following guidelines:\n\n"
-                        "1. Analyze the article content and generate up to 3 specific questions that can be answered using direct quotes or specific information from the article. "
-                        "* Each question should be about something that has happened or been learned only in the past 7 days. It should be newsworthy and significant."
-                        "* Each question should ask a question that can be researched rather than referencing the specific article, as the answerer will be searching for the answer online instead of having the specific article to reference."
-                        "* Each question should be clear, specific, and test the ability to find information within the text.\n\n"
-                        "2. Each answer should be a direct quote or specific information from the article that answers the question. Create questions where the answer is clear and specific, rather than vague answers like \"good enough\" or \"get moving\"."
-                        "Include the exact text from the article that contains the answer.\n\n"
-                        "3. Your response must be in a JSON schema with an array of objects, each containing: 'question', 'answer', and 'answer_context'. "
-                        "'answer_context' should contain the exact text from the article that contains the answer.\n\n"
-                        "4. If the article doesn't contain enough specific information to generate good question-answer pairs, output 'SKIP' for all values.\n\n"
-                        "Example response:\n"
-                        "{\n"
-                        "  \"qa_pairs\": [\n"
-                        "    {\n"
-                        "      \"question\": \"What specific action did the Federal Reserve announce regarding interest rates?\",\n"
-                        "      \"answer\": \"The Federal Reserve announced it would maintain the current interest rates.\",\n"
-                        "      \"answer_context\": \"In a statement released today, the Federal Reserve announced it would maintain the current interest rates, citing stable economic indicators.\"\n"
-                        "    },\n"
-                        "    {\n"
-                        "      \"question\": \"What was the reported inflation rate for October 2024 that influenced the Fed's decision to maintain interest rates?\",\n"
-                        "      \"answer\": \"The inflation rate was 3.2% in October 2024\",\n"
-                        "      \"answer_context\": \"The Federal Reserve's decision was influenced by the latest economic data showing inflation at 3.2% in October 2024, down from 3.7% in September 2024.\"\n"
-                        "    }\n"
-                        "    {\n"
-                        "      \"question\": \"What did Jerome Powell say about the health of the economy in his speech at the National Press Club?\",\n"
-                        "      \"answer\": \"Jerome Powell said the economy is strong and growing.\",\n"
-                        "      \"answer_context\": \"Jerome Powell spoke at the National Press Club about the state of the economy. He said the economy is strong and growing, but the Fed is keeping interest rates low to support the economy.\"\n"
-                        "    }\n"
-                        "  ]\n"
-                        "}"
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": f"Article title: {title}\n\nArticle content:\n{content}\n\nGenerate up to 3 questions and answers based on this article:"
-                }
-            ],
-            temperature=0.2,
-            max_tokens=2500,
-            response_format={"type": "json_object"},
-        )
-        content = response.choices[0].message.content
-        if not content:
-            console.print(f"[red]Empty response for article: {title}[/red]")
-            return None
-        result = json.loads(content)
-        qa_pairs = result.get("qa_pairs", [])
-        if not qa_pairs or qa_pairs[0].get("question") == "SKIP":
-            return None
-        return qa_pairs
-    except json.JSONDecodeError:
+        result = _lookup_cached_result(cache_key, title, content)
+        if result is None:
+            result = _check_qa_result(await llm_cache.chat_json(client, request))
+            _store_result(cache_key, title, result)
+        return _extract_qa_pairs(result)
+    except orjson.JSONDecodeError:
         console.print(f"[red]Invalid JSON response for article: {title}[/red]")
         return None
-    except Exception as e:
+    except (ValueError, APIError) as e:
         console.print(f"[red]Error generating questions and answers: {e}[/red]")
         return None
 
-def evaluate_questions(articles: List[Article], client: Groq) -> List[int]:
-    """Evaluate questions and answers using an LLM to determine which to keep."""
-    indices_to_keep = []
-    offset = 0
-    
-    for i in range(0, len(articles), 5):
-        batch = articles[i:i+5]
-        batch_content = [
-            {
-                "question": article.question,
-                "answer": article.answer
-            }
-            for article in batch
-        ]
+async def generate_questions_and_answers_batch(articles: List[Tuple[str, str]], client: AsyncGroq) -> List[Optional[List[Dict[str, str]]]]:
+    """Generate questions and answers for several (title, content) articles in a single Groq request.
+    
+    Cached articles are answered locally. Articles the model leaves out of the batch
+    response, or returns malformed, fall back to one request each. If the batch request
+    itself fails, its articles get None rather than a burst of single requests.
+    """
+    cache_keys = [llm_cache.request_key(_qa_request(title, content)) for title, content in articles]
+    results = [
+        _lookup_cached_result(cache_key, title, content)
+        for cache_key, (title, content) in zip(cache_keys, articles)
+    ]
+    pending = [i for i, result in enumerate(results) if result is None]
+    # A lone uncached article is simply sent on its own
+    fallback = pending if len(pending) == 1 else []
+    
+    if len(pending) > 1:
+        articles_text = "\n\n".join(
+            QA_BATCH_ARTICLE_TEMPLATE.format(index=n, title=articles[i][0], content=articles[i][1])
+            for n, i in enumerate(pending)
+        )
         try:
-            response = client.chat.completions.create(
-                model="meta-llama/llama-4-maverick-17b-128e-instruct",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a helpful assistant that evaluates questions and answers in JSON format to filter question answer pairsthat will be used to test an LLM's ability to access real-time information from news headlines. "
-                            "Use the following guidelines:\n\n"
-                            "1. Analyze each question and answer pair to determine if it meets the criteria of being clear, specific, and based on a real-time event. The question should include a date or time-related detail from the article, or be specific enough to remain relevant beyond a few weeks. The question MUST be about something that has happened or been learned only in the past 7 days. Choose the most difficult questions to answer, that are very specific and detailed, rather than a simple fact or event."
-                            "If the pair is strong, include its index in the response. Include any pairs that are strong based on this criteria.\n\n"
-                            "2. Return a JSON object with reasoning and indices fields."
-                            "Example response: {\"reasoning\": \"Pair 0 is good because...\", \"indices\": [0, 1, 2]}"
-                            "Example strong pairs:\n"
-                            "[{\"question\": \"What was the outcome of SpaceX's launch yesterday?\", \"answer\": \"SpaceX successfully launched 22 Starlink satellites yesterday from Florida.\"},\n"
-                            " {\"question\": \"Who won the recent World Series?\", \"answer\": \"The Texas Rangers won the recent World Series.\"},\n"
-                            " {\"question\": \"What did the Fed announce about interest rates this week?\", \"answer\": \"The Federal Reserve announced it is maintaining current interest rates this week.\"}]"
-                            "Example weak pairs:\n"
-                            "[{\"question\": \"What is the capital of France?\", \"answer\": \"Paris is the capital of France.\"},\n"
-                            " {\"question\": \"Who won the presidential election five years ago in 2020?\", \"answer\": \"Joe Biden won the presidential election in 2020.\"}]"
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Evaluate these question-answer pairs: {json.dumps(batch_content)}"
-                    }
+            # The combined response is not cached; each article's share is stored under its own request key
+            batch_result = await llm_cache.chat_json(client, {
+                "model": QA_MODEL,
+                "messages": [
+                    QA_SYSTEM_MESSAGE,
+                    {"role": "user", "content": QA_BATCH_USER_TEMPLATE.format(instructions=QA_BATCH_INSTRUCTIONS, articles=articles_text)}
                 ],
-                temperature=0.2,
-                max_tokens=2000,
-                response_format={"type": "json_object"}
-            )
+                "temperature": 0.2,
+                "max_tokens": min(QA_MAX_TOKENS * len(pending), 8192),
+                "response_format": QA_BATCH_RESPONSE_FORMAT
+            })
+            entries = batch_result.get("articles", []) if isinstance(batch_result, dict) else []
+            for entry in entries:
+                n = entry.get("index") if isinstance(entry, dict) else None
+                if not isinstance(n, int) or not 0 <= n < len(pending) or not _is_valid_qa_pairs(entry.get("qa_pairs")):
+                    continue
+                i = pending[n]
+                results[i] = {"qa_pairs": entry["qa_pairs"]}
+                _store_result(cache_keys[i], articles[i][0], results[i])
+            # Only slots missing or malformed in a response that parsed are retried one by one
+            fallback = [i for i in pending if results[i] is None]
+        except orjson.JSONDecodeError:
+            console.print(f"[red]Invalid JSON response for batch of {len(pending)} articles[/red]")
+        except (ValueError, APIError) as e:
+            console.print(f"[red]Error generating batched questions and answers: {e}[/red]")
+    
+    qa_pairs = [_extract_qa_pairs(result) if result is not None else None for result in results]
+    fallback_pairs = await asyncio.gather(*(generate_questions_and_answers(*articles[i], client) for i in fallback))
+    for i, pairs in zip(fallback, fallback_pairs):
+        qa_pairs[i] = pairs
+    return qa_pairs
+
+async def generate_questions_and_answers_with_batch_api(articles: List[Tuple[str, str]], client: AsyncGroq) -> List[Optional[List[Dict[str, str]]]]:
+    """Generate questions and answers for (title, content) articles through Groq's Batch API.
+    
+    Trades latency for cost: every uncached article becomes one request in a single batch job,
+    which is not bound by per-minute rate limits. Articles whose request fails get None.
+    """
+    chat_requests = [_qa_request(title, content) for title, content in articles]
+    cache_keys = [llm_cache.request_key(request) for request in chat_requests]
+    results = [
+        _lookup_cached_result(cache_key, title, content)
+        for cache_key, (title, content) in zip(cache_keys, articles)
+    ]
+    bodies = {str(i): request for i, (request, result) in enumerate(zip(chat_requests, results)) if result is None}
+    
+    try:
+        contents = await batch_runner.run_chat_batch(client, bodies)
+    except (ValueError, APIError) as e:
+        console.print(f"[red]Error running batch job: {e}[/red]")
+        contents = {}
+    for custom_id, content in contents.items():
+        i = int(custom_id)
+        try:
+            results[i] = _check_qa_result(orjson.loads(content))
+        except orjson.JSONDecodeError:
+            console.print(f"[red]Invalid JSON response for article: {articles[i][0]}[/red]")
+            continue
+        except ValueError as e:
+            console.print(f"[red]Error generating questions and answers for {articles[i][0]}: {e}[/red]")
+            continue
+        _store_result(cache_keys[i], articles[i][0], results[i])
+    
+    return [_extract_qa_pairs(result) if result is not None else None for result in results]
+
+def _check_eval_result(result: Any) -> Dict:
+    """Return a parsed evaluator reply if it has a list of indices, raising ValueError otherwise."""
+    # Schema mode is best effort, and JSON mode only guarantees some JSON value
+    if not isinstance(result, dict) or not isinstance(result.get('indices'), list):
+        raise ValueError(f"Evaluator returned no list of indices: {result!r:.200}")
+    return result
+
+async def _evaluate_batch(batch: List[Article], client: AsyncGroq) -> List[int]:
+    """Evaluate one batch of Q&A pairs and return the indices, within the batch, of the pairs to keep."""
+    batch_content = [
+        {
+            "id": local_idx,
+            "question": article.question,
+            "answer": article.answer
+        }
+        for local_idx, article in enumerate(batch)
+    ]
+    try:
+        result = await llm_cache.cached_chat(client, {
+            "model": EVAL_MODEL,
+            "messages": [
+                EVAL_SYSTEM_MESSAGE,
+                {"role": "user", "content": EVAL_USER_TEMPLATE.format(pairs=orjson.dumps(batch_content).decode())}
+            ],
+            "temperature": 0.2,
+            # Room for the reasoning text, which grows with the number of pairs
+            "max_tokens": min(500 + 100 * len(batch), 8192),
+            "response_format": EVAL_RESPONSE_FORMAT
+        }, validate=_check_eval_result)
+        logger.debug("Evaluator response: %s", result)
+        indices_to_keep = [i for i in result['indices'] if isinstance(i, int) and 0 <= i < len(batch)]
+        logger.debug("Received indices from LLM: %s", indices_to_keep)
+        return indices_to_keep
+    except (ValueError, APIError) as e:
+        console.print(f"[red]Error evaluating batch of {len(batch)} questions: {e}[/red]")
+        return []
 
-            print(response.choices[0].message.content)
-            content = response.choices[0].message.content.strip()
-            result = json.loads(content)
-            new_indices_to_keep = result.get('indices', [])
-            console.print(f"[blue]Received indices from LLM: {new_indices_to_keep}, current offset: {offset}[/blue]")  # Debug log
-            indices_to_keep.extend([i + offset for i in new_indices_to_keep])
-            offset += 5
+async def _run_bounded(semaphore: asyncio.Semaphore, coro: Awaitable[T]) -> T:
+    """Await a coroutine while holding a slot of the shared concurrency limit."""
+    async with semaphore:
+        return await coro
 
-            console.print(f"[green]Running indices to keep: {indices_to_keep}[/green]")
-        except Exception as e:
-            console.print(f"[red]Error evaluating questions: {e}[/red]")
-            return []
+async def _fetch_feed_entries(session: aiohttp.ClientSession, feed_info: Dict, max_articles: Optional[int], max_age_days: int) -> List[Tuple[str, str, datetime]]:
+    """Fetch a feed and return (title, link, published_dt) for entries published within max_age_days."""
+    feed = await fetch_feed_async(session, feed_info['url'])
+    if not feed.entries:
+        console.print(f"[red]No articles found for feed: {feed_info['url']}[/red]")
+        return []
+    
+    logger.debug("Articles in feed %s: %d", feed_info['url'], len(feed.entries))
+    
+    # Pull each field out as its own column so filters run as masks before any tuples are built
+    titles = [entry.get('title', 'No title') for entry in feed.entries]
+    links = [entry.get('link', 'No link') for entry in feed.entries]
+    published_dts = parse_dates([entry.get('published', 'No date') for entry in feed.entries])
     
-    console.print(f"[blue]Final indices to keep: {indices_to_keep}[/blue]")  # Debug log
-    return indices_to_keep
+    # Filter out articles older than the retention window before any content is fetched
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    recent = [published_dt is not None and published_dt > cutoff for published_dt in published_dts]
+    entries = list(compress(zip(titles, links, published_dts), recent))
+    
+    logger.debug("Articles left in feed %s: %d", feed_info['url'], len(entries))
+    
+    return entries[:max_articles]
+
+async def _extract_content(session: aiohttp.ClientSession, entry: Tuple[str, str, datetime], timeout: int) -> Tuple[str, str, datetime, Optional[str], Optional[str], Optional[int]]:
+    """Download and extract an entry's article, returning it with its content hash and simhash."""
+    title, link, published_dt = entry
+    html = await fetch_html(session, link, timeout=timeout)
+    if not html:
+        return title, link, published_dt, None, None, None
+    # Workers cannot print without garbling the progress display, so failures are reported here
+    content, digest, fingerprint, error = await run_in_parse_pool(parse_article_html, link, html)
+    if error:
+        console.print(error)
+    return title, link, published_dt, content, digest, fingerprint
+
+async def _generate_for_batch(batch: List[Tuple[str, str, datetime, str]], client: AsyncGroq) -> List[Tuple[Tuple[str, str, datetime, str], Optional[List[Dict[str, str]]]]]:
+    qa_pairs = await generate_questions_and_answers_batch(_prompt_articles(batch), client)
+    return list(zip(batch, qa_pairs))
 
-def process_articles(feeds: List[Dict], client: Groq, test: bool = False, timeout: int = 20) -> List[Article]:
+async def _generate_with_batch_api(batch: List[Tuple[str, str, datetime, str]], client: AsyncGroq) -> List[Tuple[Tuple[str, str, datetime, str], Optional[List[Dict[str, str]]]]]:
+    qa_pairs = await generate_questions_and_answers_with_batch_api(_prompt_articles(batch), client)
+    return list(zip(batch, qa_pairs))
+
+async def _run_stage(workers: List[Awaitable], queue: asyncio.Queue, consumers: int) -> None:
+    """Run a pipeline stage's workers to completion, then send a None sentinel to each downstream consumer."""
+    for result in await asyncio.gather(*workers, return_exceptions=True):
+        if isinstance(result, Exception):
+            console.print(f"[red]Pipeline worker failed: {result}[/red]")
+    for _ in range(consumers):
+        await queue.put(None)
+
+async def _next_batch(queue: asyncio.Queue, batch_size: int) -> Tuple[List, bool]:
+    """Wait for one queued item, then take whatever else is already queued, up to batch_size.
+    
+    Returns the batch and whether the end-of-input sentinel was reached.
+    """
+    batch = []
+    item = await queue.get()
+    while item is not None:
+        batch.append(item)
+        if len(batch) >= batch_size or queue.empty():
+            return batch, False
+        item = queue.get_nowait()
+    return batch, True
+
+async def process_articles(feeds: List[Dict], client: AsyncGroq, test: bool = False, timeout: int = 20, concurrency: int = 32, batch_size: int = 4, per_host_limit: int = 2, max_age_days: int = 7, double_check: bool = False, batch_api: bool = False, checkpoint_path: Optional[str] = None, eval_batch_size: int = 25, eval_concurrency: int = 8) -> List[Article]:
     """Process articles from all feeds and generate questions and answers.
     
+    Feed downloads, article downloads, generation and evaluation run as pipeline stages
+    connected by bounded queues, so each stage starts on the first results of the one before.
+    
     Args:
         feeds: List of feed dictionaries containing URLs
         client: Groq client instance
         test: Whether to run in test mode (limited articles)
         timeout: Timeout in seconds for processing each article
+        concurrency: Maximum number of feed, article and Groq requests in flight at once
+        batch_size: Number of articles sent to the model in a single request
+        per_host_limit: Maximum number of concurrent feed requests to a single host
+        max_age_days: Skip entries published more than this many days ago
+        double_check: Also run the separate evaluator over the pairs the generator kept
+        batch_api: Generate through Groq's Batch API (cheaper, not rate limited, but may take hours)
+        checkpoint_path: JSONL file each kept article is appended to as soon as it is generated.
+            Articles already in the file are loaded instead of being processed again, so an
+            interrupted run can be resumed.
+        eval_batch_size: Number of pairs sent to the evaluator in a single request
+        eval_concurrency: Maximum number of evaluator requests in flight at once
     """
     articles = []
     max_articles = 5 if test else None
+    semaphore = asyncio.Semaphore(concurrency)
+    eval_semaphore = asyncio.Semaphore(eval_concurrency)
+    previous = load_checkpoint(checkpoint_path) if checkpoint_path else []
+    if previous:
+        console.print(f"[blue]Resuming from {checkpoint_path} with {len(previous)} entries[/blue]")
     
-    with Progress() as progress:
-        feed_task = progress.add_task("[cyan]Processing feeds...", total=len(feeds))
-        
-        for feed_info in feeds:
-            feed = fetch_feed(feed_info['url'])
-            if not feed.entries:
-                console.print(f"[red]No articles found for feed: {feed_info['url']}[/red]")
-                progress.update(feed_task, advance=1)
-                continue
-            
-            # print how many articles are in the feed
-            console.print(f"[blue]Articles in feed: {len(feed.entries)}[/blue]")
+    # Bounded so a fast stage waits for a slow one instead of buffering the whole run;
+    # a None on a queue tells one consumer that its input is finished
+    entries_q = asyncio.Queue(maxsize=200)
+    content_q = asyncio.Queue(maxsize=100)
+    qa_q = asyncio.Queue(maxsize=200)
+    num_fetchers = concurrency
+    # The Batch API path collects every article into a single offline job
+    num_generators = 1 if batch_api else max(1, concurrency // batch_size)
+    
+    # One session for every feed and article download; the connector keeps keep-alive
+    # connections pooled and stops a single site from taking every connection
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=8)
+    async with aiohttp.ClientSession(headers=HTTP_HEADERS, connector=connector) as session:
+        with Progress() as progress, (open_checkpoint(checkpoint_path) if checkpoint_path else nullcontext()) as checkpoint:
+            feed_task = progress.add_task("[cyan]Processing feeds...", total=len(feeds))
+            # The total grows as feeds arrive and their entries are queued
+            article_task = progress.add_task("[cyan]Processing articles...", total=0)
+            queued = 0
             
-            # Filter out articles that are older than 7 days
-            feed.entries = [entry for entry in feed.entries if is_within_7_days(entry.get('published', 'No date'))]
+            # Shuffle so feeds from the same site are not requested back to back, and cap
+            # concurrent requests per host so no single origin is hammered
+            feeds = random.sample(feeds, len(feeds))
+            host_semaphores = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
             
-            # print how many articles are left
-            console.print(f"[blue]Articles left: {len(feed.entries)}[/blue]")
-
-            # Calculate total articles to process for this feed
-            total_articles = min(len(feed.entries), max_articles) if max_articles else len(feed.entries)
-            article_task = progress.add_task(f"[cyan]Processing articles from {feed_info['url']}...", total=total_articles)
+            seen_titles = set()
+            # Syndicated copies often append the source's name to the headline
+            publishers = [feed_info['name'] for feed_info in feeds if feed_info.get('name')]
+            seen_urls = {canonicalize_url(article.link) for article in previous}
+            seen_hashes = set()
+            seen_simhashes = []
             
-            for i, entry in enumerate(feed.entries):
-                if max_articles and i >= max_articles:
-                    break
-                    
-                title = entry.get('title', 'No title')
-                link = entry.get('link', 'No link')
-                date = format_date(entry.get('published', 'No date'))
-                
+            async def read_feed(feed_info: Dict) -> None:
+                nonlocal queued
                 try:
-                    # Extract article content with timeout
-                    content = extract_article_content(link, timeout=timeout)
-                    if not content:
+                    entries = await _run_bounded(
+                        host_semaphores[urlparse(feed_info['url']).netloc],
+                        _run_bounded(semaphore, _fetch_feed_entries(session, feed_info, max_articles, max_age_days))
+                    )
+                except Exception as e:
+                    console.print(f"[yellow]Skipping feed after unexpected error: {e}[/yellow]")
+                    entries = []
+                for entry in entries:
+                    # Skip links already queued from another feed or saved by an earlier run
+                    canonical_url = canonicalize_url(entry[1])
+                    if canonical_url in seen_urls:
+                        continue
+                    seen_urls.add(canonical_url)
+                    # Skip syndicated copies of a story already queued from another feed
+                    normalized_title = normalize_title(entry[0], publishers)
+                    if normalized_title in seen_titles:
+                        continue
+                    seen_titles.add(normalized_title)
+                    queued += 1
+                    progress.update(article_task, total=queued)
+                    await entries_q.put(entry)
+                progress.update(feed_task, advance=1)
+            
+            async def fetch_articles() -> None:
+                while (entry := await entries_q.get()) is not None:
+                    try:
+                        title, link, published_dt, content, digest, fingerprint = await _run_bounded(semaphore, _extract_content(session, entry, timeout))
+                    except Exception as e:
+                        console.print(f"[red]Error processing article {entry[1]}: {e}[/red]")
+                        content = None
+                    # Wire snippets and undated pieces are dropped before they cost a generator call
+                    if not content or not _should_attempt(content):
                         progress.update(article_task, advance=1)
                         continue
-                    
-                    # Generate multiple Q&A pairs with timeout
-                    qa_pairs = generate_questions_and_answers(title, content, client)
-                    if qa_pairs:
-                        for qa_pair in qa_pairs:
-                            articles.append(Article(
-                                title=title,
-                                link=link,
-                                date=date,
-                                content=content,
-                                question=qa_pair['question'],
-                                answer=qa_pair['answer'],
-                                answer_context=qa_pair['answer_context']
-                            ))
-                except TimeoutError:
-                    console.print(f"[yellow]Timeout processing article: {title}[/yellow]")
-                except Exception as e:
-                    console.print(f"[red]Error processing article {title}: {str(e)}[/red]")
+                    # Skip the same story republished under a different URL and headline
+                    if digest in seen_hashes or is_near_duplicate(fingerprint, seen_simhashes):
+                        progress.update(article_task, advance=1)
+                        continue
+                    seen_hashes.add(digest)
+                    seen_simhashes.append(fingerprint)
+                    await content_q.put((title, link, published_dt, content))
+            
+            async def record(results: List[Tuple[Tuple[str, str, datetime, str], Optional[List[Dict[str, str]]]]]) -> None:
+                for (title, link, published_dt, content), qa_pairs in results:
+                    progress.update(article_task, advance=1)
+                    # Generate multiple Q&A pairs per article; the generator judges its own
+                    # pairs, so weak ones are dropped here, as are malformed ones
+                    kept = [
+                        Article(
+                            title=title,
+                            link=link,
+                            date=published_dt.strftime(DATE_FORMAT),
+                            published_dt=published_dt,
+                            content=content,
+                            question=qa_pair['question'],
+                            answer=qa_pair['answer'],
+                            answer_context=qa_pair['answer_context']
+                        )
+                        for qa_pair in qa_pairs or []
+                        if _is_valid_qa_pair(qa_pair) and qa_pair['keep']
+                    ]
+                    if checkpoint and kept:
+                        # All of an article's pairs go in one write, since a resumed run skips
+                        # every link that already has a row
+                        checkpoint.write(b"".join(orjson.dumps(asdict(article)) + b"\n" for article in kept))
+                        checkpoint.flush()
+                    for article in kept:
+                        if double_check:
+                            await qa_q.put(article)
+                        else:
+                            articles.append(article)
+            
+            async def generate_articles() -> None:
+                finished = False
+                while not finished:
+                    batch, finished = await _next_batch(content_q, batch_size)
+                    if not batch:
+                        continue
+                    try:
+                        await record(await _run_bounded(semaphore, _generate_for_batch(batch, client)))
+                    except Exception as e:
+                        console.print(f"[red]Error processing batch of articles: {str(e)}[/red]")
+            
+            async def generate_with_batch_api() -> None:
+                batch = []
+                while (item := await content_q.get()) is not None:
+                    batch.append(item)
+                if batch:
+                    try:
+                        await record(await _generate_with_batch_api(batch, client))
+                    except Exception as e:
+                        console.print(f"[red]Error processing batch of articles: {str(e)}[/red]")
+            
+            async def evaluate_articles() -> None:
+                # Re-check the self-evaluated pairs with the separate evaluator as soon as a batch
+                # fills up; pairs resumed from the checkpoint are re-checked along with the new ones
+                pending = list(previous)
+                eval_tasks = []
                 
-                progress.update(article_task, advance=1)
+                def dispatch(batch: List[Article]) -> None:
+                    eval_tasks.append((batch, asyncio.create_task(_run_bounded(eval_semaphore, _evaluate_batch(batch, client)))))
+                
+                while (article := await qa_q.get()) is not None:
+                    pending.append(article)
+                    while len(pending) >= eval_batch_size:
+                        dispatch(pending[:eval_batch_size])
+                        pending = pending[eval_batch_size:]
+                for offset in range(0, len(pending), eval_batch_size):
+                    dispatch(pending[offset:offset + eval_batch_size])
+                for batch, task in eval_tasks:
+                    # One bad batch must not abort the run after all generation has finished
+                    try:
+                        articles.extend(batch[i] for i in await task)
+                    except Exception as e:
+                        console.print(f"[red]Error evaluating batch of {len(batch)} questions: {e}[/red]")
+            
+            generate = generate_with_batch_api if batch_api else generate_articles
+            await asyncio.gather(
+                _run_stage([read_feed(feed_info) for feed_info in feeds], entries_q, num_fetchers),
+                _run_stage([fetch_articles() for _ in range(num_fetchers)], content_q, num_generators),
+                _run_stage([generate() for _ in range(num_generators)], qa_q, 1 if double_check else 0),
+                *([evaluate_articles()] if double_check else [])
+            )
             
             progress.remove_task(article_task)
-            progress.update(feed_task, advance=1)
     
-    # Evaluate and filter articles
-    indices_to_keep = evaluate_questions(articles, client)
-    return [articles[i] for i in indices_to_keep]
+    if double_check:
+        return articles
+    return previous + articles
 
-def save_dataset(articles: List[Article], filename: str = "news_questions.json"):
-    """Save the generated questions and answers to a JSON file."""
-    dataset = [
-        {
-            "id": idx,
-            "question": article.question,
-            "answer": article.answer,
-            "answer_context": article.answer_context,
-            "title": article.title,
-            "link": article.link,
-            "date": article.date,
-            "content": article.content
-        }
-        for idx, article in enumerate(articles)
-    ]
+def save_dataset(articles: Iterable[Article], filename: str = "news_questions.json"):
+    """Save the generated questions and answers to a JSON file, serializing one record at a time.
     
-    with open(filename, 'w') as f:
-        json.dump(dataset, f, indent=2)
+    Accepts any iterable, e.g. iter_checkpoint(...), so the dataset never has to be held in memory.
+    """
+    count = 0
+    with open(filename, 'wb') as f:
+        f.write(b"[")
+        for idx, article in enumerate(articles):
+            record = orjson.dumps(
+                {
+                    "id": idx,
+                    "question": article.question,
+                    "answer": article.answer,
+                    "answer_context": article.answer_context,
+                    "title": article.title,
+                    "link": article.link,
+                    "date": article.date,
+                    "content": article.content
+                },
+                option=orjson.OPT_INDENT_2
+            )
+            # Indent each record so the file matches a pretty-printed array
+            f.write((b",\n  " if idx else b"\n  ") + record.replace(b"\n", b"\n  "))
+            count += 1
+        f.write(b"\n]" if count else b"]")
     
-    console.print(f"[green]Dataset saved to {filename} with {len(articles)} entries[/green]") 
\ No newline at end of file
+    console.print(f"[green]Dataset saved to {filename} with {count} entries[/green]")